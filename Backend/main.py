@@ -1,13 +1,23 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 from routers import ticket_router, conversation_router, chat_router, upload_router, tts_router
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Optionally start loading the TTS models in the background"""
+    # Opt-in, so deployments that never use /tts keep torch out of memory
+    if os.getenv("TTS_PRELOAD", "").lower() in ("1", "true", "yes"):
+        from services.tts_service import tts_service
+        tts_service.start_initialization()
+    yield
+
 # Create FastAPI app
-app = FastAPI(title="IT HelpDesk Chatbot API", version="1.0.0")
+app = FastAPI(title="IT HelpDesk Chatbot API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
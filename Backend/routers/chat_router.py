@@ -1,11 +1,12 @@
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from models.chat_models import ChatMessage, ChatResponse
 from services.conversation_service import ConversationService
 from services.ticket_service import TicketService
 from services.chat_service import ChatService
 import uuid
-from datetime import datetime
+from functools import lru_cache
 
 router = APIRouter()
 
@@ -16,6 +17,9 @@ def get_conversation_service():
 def get_ticket_service():
     return TicketService()
 
+# ChatService holds only API clients, so one instance is built on first use
+# (after main.py has loaded .env) and shared by every request
+@lru_cache(maxsize=1)
 def get_chat_service():
     return ChatService()
 
@@ -29,33 +33,41 @@ async def chat(
     """Handle chat messages with OpenAI integration and function calling"""
     try:
         conversation_id = chat_request.conversation_id or str(uuid.uuid4())
+
+        # The turn awaits the model between load and save; hold the
+        # conversation's lock so concurrent turns and deletes do not overwrite
+        # each other
+        async with conversation_service.get_lock(conversation_id):
+            # Load existing conversation or create new one
+            conversation = conversation_service.load_conversation(conversation_id)
+            if not conversation:
+                conversation = conversation_service.create_conversation(conversation_id)
         
-        # Load existing conversation or create new one
-        conversation = conversation_service.load_conversation(conversation_id)
-        if not conversation:
-            conversation = conversation_service.create_conversation(conversation_id)
-        
-        conversation_service.add_message(
-            conversation,
-            role="user",
-            content=chat_request.message,
-        )
-        
-        # Get AI response
-        #assistant_message, function_calls = await openai_service.get_chat_response(messages)
-        assistant_message = chat_service.get_response(conversation['messages'], chat_request.message)
-        # Add user message to conversation
-       
-        if assistant_message is not None and isinstance(assistant_message, str):
-            # Add assistant message to conversation
             conversation_service.add_message(
                 conversation,
-                role="assistant",
-                content=assistant_message
+                role="user",
+                content=chat_request.message,
+            )
+        
+            # Get AI response
+            #assistant_message, function_calls = await openai_service.get_chat_response(messages)
+            # Retrieval and the completion are blocking network calls; run them on
+            # the threadpool so other requests (TTS, uploads) keep being served
+            assistant_message = await run_in_threadpool(
+                chat_service.get_response, conversation['messages'], chat_request.message
             )
+            # Add user message to conversation
+       
+            if assistant_message:
+                # Add assistant message to conversation
+                conversation_service.add_message(
+                    conversation,
+                    role="assistant",
+                    content=assistant_message
+                )
             
-        # Save conversation
-        conversation_service.save_conversation(conversation)
+            # Save conversation
+            conversation_service.save_conversation(conversation)
         
         return ChatResponse(
             response=assistant_message,
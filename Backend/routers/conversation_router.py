@@ -1,5 +1,4 @@
 from fastapi import APIRouter, HTTPException, Depends
-from typing import List
 from services.conversation_service import ConversationService
 
 router = APIRouter()
@@ -38,7 +37,9 @@ async def delete_conversation(
     conversation_service: ConversationService = Depends(get_conversation_service)
 ):
     """Delete a conversation"""
-    success = conversation_service.delete_conversation(conversation_id)
+    # Waits for an in-flight chat turn, whose save would otherwise restore it
+    async with conversation_service.get_lock(conversation_id):
+        success = conversation_service.delete_conversation(conversation_id)
     if not success:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return {"message": "Conversation deleted successfully"}
\ No newline at end of file
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List
-from models.ticket_models import TicketCreate, TicketUpdate, Ticket
+from models.ticket_models import TicketCreate, TicketUpdate
 from services.ticket_service import TicketService
 
 router = APIRouter()
@@ -9,13 +9,16 @@ router = APIRouter()
 def get_ticket_service():
     return TicketService()
 
+# Plain def routes run on FastAPI's threadpool: the ticket service takes a
+# threading lock that chat workers hold across a full tickets.json rewrite,
+# and waiting on it must not block the event loop
 @router.get("/tickets", response_model=List[dict])
-async def get_tickets(ticket_service: TicketService = Depends(get_ticket_service)):
+def get_tickets(ticket_service: TicketService = Depends(get_ticket_service)):
     """Get all tickets"""
     return ticket_service.get_all_tickets()
 
 @router.post("/tickets", response_model=dict)
-async def create_ticket(
+def create_ticket(
     ticket: TicketCreate,
     ticket_service: TicketService = Depends(get_ticket_service)
 ):
@@ -23,7 +26,7 @@ async def create_ticket(
     return ticket_service.create_ticket(ticket)
 
 @router.get("/tickets/{ticket_id}", response_model=dict)
-async def get_ticket(
+def get_ticket(
     ticket_id: str,
     ticket_service: TicketService = Depends(get_ticket_service)
 ):
@@ -34,7 +37,7 @@ async def get_ticket(
     return ticket
 
 @router.put("/tickets/{ticket_id}", response_model=dict)
-async def update_ticket(
+def update_ticket(
     ticket_id: str,
     updates: TicketUpdate,
     ticket_service: TicketService = Depends(get_ticket_service)
@@ -46,7 +49,7 @@ async def update_ticket(
     return ticket
 
 @router.delete("/tickets/{ticket_id}")
-async def delete_ticket(
+def delete_ticket(
     ticket_id: str,
     ticket_service: TicketService = Depends(get_ticket_service)
 ):
@@ -1,9 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import Optional
 import logging
-import io
 from services.tts_service import get_tts_service, TTSService
 
 # Configure logging
@@ -23,7 +22,7 @@ class TTSResponse(BaseModel):
     message: str
     audio_length: Optional[float] = None
 
-@router.post("/convert", response_class=StreamingResponse)
+@router.post("/convert", response_class=Response)
 async def text_to_speech(
     request: TTSRequest,
     tts_service: TTSService = Depends(get_tts_service)
@@ -36,7 +35,7 @@ async def text_to_speech(
         tts_service: TTS service dependency
         
     Returns:
-        StreamingResponse with audio data in WAV format
+        Response with audio data in WAV format
     """
     try:
         # Validate input
@@ -54,18 +53,15 @@ async def text_to_speech(
             sample_rate=request.sample_rate
         )
         
-        # Create audio stream
-        audio_stream = io.BytesIO(audio_data)
-        
         logger.info("TTS conversion completed successfully")
         
-        # Return streaming response
-        return StreamingResponse(
-            io.BytesIO(audio_data),
+        # The whole WAV is already in memory, so send it as one body;
+        # Response sets Content-Length itself
+        return Response(
+            content=audio_data,
             media_type="audio/wav",
             headers={
                 "Content-Disposition": "attachment; filename=speech.wav",
-                "Content-Length": str(len(audio_data)),
                 "Cache-Control": "no-cache"
             }
         )
@@ -105,13 +101,21 @@ async def tts_health_check(tts_service: TTSService = Depends(get_tts_service)):
                 "message": "TTS dependencies not installed. Run: pip install transformers torch torchaudio soundfile datasets"
             }
         
+        if tts_service.is_ready:
+            status = "healthy"
+        elif tts_service.is_loading:
+            status = "loading"
+        else:
+            status = "not_initialized"
+        
         return {
-            "status": "healthy" if tts_service._initialized else "not_initialized",
+            "status": status,
             "service": "text-to-speech",
             "model": "microsoft/speecht5_tts",
-            "initialized": tts_service._initialized,
+            "initialized": tts_service.is_ready,
             "dependencies_available": True,
-            "device": str(tts_service.device) if tts_service._initialized else "not_initialized"
+            "device": str(tts_service.device) if tts_service.is_ready else "not_initialized",
+            "quantized": tts_service.quantized
         }
     except Exception as e:
         logger.error(f"TTS health check failed: {e}")
@@ -1,37 +1,70 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from services.upload_file_service import UploadFileService
+from functools import lru_cache
 from typing import Optional
+import asyncio
 import io
-import os
 from pathlib import Path
 
-# File processing imports
-import PyPDF2
-import docx
-import openpyxl
-import csv
+# File processing imports; the PDF, Word and Excel parsers are imported in
+# the branch that needs them so app startup does not load all three
 import json as json_lib
 
 router = APIRouter()
 
 # Dependency injection
+# Built on first use and shared; a missing API key raises and is not cached
+@lru_cache(maxsize=1)
 def get_upload_service():
     return UploadFileService()
 
 # Supported file types and their MIME types
 SUPPORTED_FILE_TYPES = {
-    'text/plain': ['.txt', '.md', '.log', '.conf', '.ini'],
-    'application/pdf': ['.pdf'],
-    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': ['.docx'],
-    'application/msword': ['.doc'],
-    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ['.xlsx'],
-    'application/vnd.ms-excel': ['.xls'],
-    'text/csv': ['.csv'],
-    'application/json': ['.json'],
-    'application/xml': ['.xml'],
-    'text/xml': ['.xml'],
-    'text/html': ['.html', '.htm']
+    'text/plain': ('.txt', '.md', '.log', '.conf', '.ini'),
+    'application/pdf': ('.pdf',),
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': ('.docx',),
+    'application/msword': ('.doc',),
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ('.xlsx',),
+    'application/vnd.ms-excel': ('.xls',),
+    'text/csv': ('.csv',),
+    'application/json': ('.json',),
+    'application/xml': ('.xml',),
+    'text/xml': ('.xml',),
+    'text/html': ('.html', '.htm')
+}
+
+# Membership sets built once at import so validation is a hash lookup
+SUPPORTED_EXTENSIONS = frozenset(
+    ext for extensions in SUPPORTED_FILE_TYPES.values() for ext in extensions
+)
+SUPPORTED_CONTENT_TYPES = tuple(SUPPORTED_FILE_TYPES)
+TEXT_EXTENSIONS = frozenset(['.txt', '.md', '.log', '.conf', '.ini', '.yaml', '.yml', '.json', '.xml', '.html', '.htm'])
+# Extensions that extract_text_from_file decodes directly or reads as workbooks
+PLAIN_TEXT_EXTENSIONS = frozenset(['.txt', '.md', '.log', '.conf', '.ini', '.html', '.htm', '.xml'])
+SPREADSHEET_EXTENSIONS = frozenset(['.xlsx', '.xls'])
+UNSUPPORTED_FILE_TYPE_DETAIL = (
+    f"Unsupported file type. Supported formats: {', '.join(sorted(SUPPORTED_EXTENSIONS))}"
+)
+
+# Static response for /upload/supported-types, built once at import
+SUPPORTED_TYPES_INFO = {
+    "supported_extensions": sorted(SUPPORTED_EXTENSIONS),
+    "file_types": {
+        "documents": [".pdf", ".docx", ".doc"],
+        "spreadsheets": [".xlsx", ".xls", ".csv"],
+        "text_files": [".txt", ".md", ".log", ".conf", ".ini"],
+        "data_files": [".json", ".xml", ".csv"],
+        "web_files": [".html", ".htm"]
+    },
+    "max_file_size": "50MB",
+    "features": [
+        "AI-powered metadata extraction",
+        "Content chunking for large files",
+        "Automatic text extraction",
+        "Custom metadata support"
+    ]
 }
 
 def extract_text_from_file(file_content: bytes, filename: str, content_type: str) -> str:
@@ -42,38 +75,35 @@ def extract_text_from_file(file_content: bytes, filename: str, content_type: str
     
     try:
         # Text files
-        if content_type.startswith('text/') or file_extension in ['.txt', '.md', '.log', '.conf', '.ini', '.html', '.htm', '.xml']:
+        if content_type.startswith('text/') or file_extension in PLAIN_TEXT_EXTENSIONS:
             return file_content.decode('utf-8', errors='ignore')
         
         # PDF files
         elif file_extension == '.pdf':
+            import PyPDF2
             pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
+            return "".join(page.extract_text() + "\n" for page in pdf_reader.pages)
         
         # Word documents
         elif file_extension == '.docx':
+            import docx
             doc = docx.Document(io.BytesIO(file_content))
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            return "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
         
         # Excel files
-        elif file_extension in ['.xlsx', '.xls']:
+        elif file_extension in SPREADSHEET_EXTENSIONS:
+            import openpyxl
             workbook = openpyxl.load_workbook(io.BytesIO(file_content))
-            text = ""
+            parts = []
             for sheet_name in workbook.sheetnames:
                 sheet = workbook[sheet_name]
-                text += f"Sheet: {sheet_name}\n"
+                parts.append(f"Sheet: {sheet_name}\n")
                 for row in sheet.iter_rows(values_only=True):
                     row_text = "\t".join([str(cell) if cell is not None else "" for cell in row])
                     if row_text.strip():
-                        text += row_text + "\n"
-                text += "\n"
-            return text
+                        parts.append(row_text + "\n")
+                parts.append("\n")
+            return "".join(parts)
         
         # CSV files
         elif file_extension == '.csv':
@@ -106,17 +136,12 @@ def validate_file_type(filename: str, content_type: str) -> bool:
     """
     file_extension = Path(filename).suffix.lower()
     
-    # Check by content type
-    for supported_type, extensions in SUPPORTED_FILE_TYPES.items():
-        if content_type.startswith(supported_type) or file_extension in extensions:
-            return True
-    
-    # Allow common text-based files
-    text_extensions = ['.txt', '.md', '.log', '.conf', '.ini', '.yaml', '.yml', '.json', '.xml', '.html', '.htm']
-    if file_extension in text_extensions:
+    # Check by extension, including common text-based files
+    if file_extension in SUPPORTED_EXTENSIONS or file_extension in TEXT_EXTENSIONS:
         return True
     
-    return False
+    # Check by content type
+    return content_type.startswith(SUPPORTED_CONTENT_TYPES)
 
 @router.post("/upload")
 async def upload_file(
@@ -145,19 +170,19 @@ async def upload_file(
         
         # Validate file type
         if not validate_file_type(file.filename, file.content_type):
-            supported_extensions = []
-            for extensions in SUPPORTED_FILE_TYPES.values():
-                supported_extensions.extend(extensions)
             raise HTTPException(
                 status_code=400,
-                detail=f"Unsupported file type. Supported formats: {', '.join(set(supported_extensions))}"
+                detail=UNSUPPORTED_FILE_TYPE_DETAIL
             )
         
         # Read file content
         file_content = await file.read()
         
-        # Extract text from file
-        text_content = extract_text_from_file(file_content, file.filename, file.content_type)
+        # Extract text from file; parsing and the store below are blocking,
+        # so both run on the threadpool as in the bulk upload
+        text_content = await run_in_threadpool(
+            extract_text_from_file, file_content, file.filename, file.content_type
+        )
         
         # Validate extracted content
         if not text_content.strip():
@@ -178,7 +203,8 @@ async def upload_file(
                 )
         
         # Store file content with metadata
-        result = upload_service.store_file_content(
+        result = await run_in_threadpool(
+            upload_service.store_file_content,
             file_content=text_content,
             file_name=file.filename,
             metadata=metadata,
@@ -220,27 +246,7 @@ async def get_supported_file_types():
     """
     Get list of supported file types and formats
     """
-    all_extensions = []
-    for extensions in SUPPORTED_FILE_TYPES.values():
-        all_extensions.extend(extensions)
-    
-    return {
-        "supported_extensions": sorted(set(all_extensions)),
-        "file_types": {
-            "documents": [".pdf", ".docx", ".doc"],
-            "spreadsheets": [".xlsx", ".xls", ".csv"],
-            "text_files": [".txt", ".md", ".log", ".conf", ".ini"],
-            "data_files": [".json", ".xml", ".csv"],
-            "web_files": [".html", ".htm"]
-        },
-        "max_file_size": "50MB",
-        "features": [
-            "AI-powered metadata extraction",
-            "Content chunking for large files",
-            "Automatic text extraction",
-            "Custom metadata support"
-        ]
-    }
+    return SUPPORTED_TYPES_INFO
 
 @router.post("/upload/bulk")
 async def bulk_upload_files(
@@ -262,32 +268,38 @@ async def bulk_upload_files(
             detail="Maximum 10 files allowed per bulk upload"
         )
     
-    results = []
-    errors = []
-    
-    for file in files:
+    async def process_file(file: UploadFile):
         try:
-            # Process each file individually
+            # Text extraction and chunk analysis/embedding are blocking, so
+            # each file runs on the threadpool and the files overlap
             file_content = await file.read()
-            text_content = extract_text_from_file(file_content, file.filename, file.content_type)
+            text_content = await run_in_threadpool(
+                extract_text_from_file, file_content, file.filename, file.content_type
+            )
             
-            result = upload_service.store_file_content(
+            result = await run_in_threadpool(
+                upload_service.store_file_content,
                 file_content=text_content,
                 file_name=file.filename,
                 use_ai_metadata=use_ai_metadata
             )
             
-            results.append({
+            return {
                 "filename": file.filename,
                 "status": result["status"],
                 "metadata": result.get("metadata", {})
-            })
+            }, None
             
         except Exception as e:
-            errors.append({
+            return None, {
                 "filename": file.filename,
                 "error": str(e)
-            })
+            }
+    
+    # gather keeps the input order, so results and errors stay in upload order
+    outcomes = await asyncio.gather(*(process_file(file) for file in files))
+    results = [result for result, _ in outcomes if result is not None]
+    errors = [error for _, error in outcomes if error is not None]
     
     return {
         "total_files": len(files),
@@ -1,10 +1,12 @@
-from fastapi import Query
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from models.ticket_models import TicketCreate
 import openai
 import os
 import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pinecone import Pinecone  # Removed unused ServerlessSpec import
 from services.ticket_service import TicketService
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
@@ -13,6 +15,93 @@ from langchain.chains import create_retrieval_chain
 from langchain_pinecone import PineconeVectorStore
 
 
+# Function-calling schema sent with every chat completion
+CHAT_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_ticket_status",
+            "description": "Get the status of a ticket",
+            "parameters": {
+                "type": "object",
+                "properties": {"ticket_id": {"type": "string"}},
+            },
+            "required": ["ticket_id"],
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "create_ticket",
+            "description": "Create a ticket",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                    "priority": {"type": "string"},
+                },
+            },
+            "required": ["title", "description"],
+        },
+    },
+]
+
+# User-facing ticket summary returned by the ticket tools
+TICKET_MESSAGE_TEMPLATE = (
+    "Ticket ID: {id}\n"
+    "Title: {title}\n"
+    "Description: {description}\n"
+    "Priority: {priority}\n"
+    "Status: {status}\n"
+    "Assignee: {assignee}\n"
+    "Created At: {created_at}\n"
+    "Last Updated: {updated_at}\n"
+)
+
+# System prompt shared by the chat completion and RAG answer paths
+SYSTEM_PROMPT = (
+    "You are an IT HelpDesk chatbot assistant. "
+    "You only support IT topics: computer issues, network problems, software troubleshooting, "
+    "email, printers, password resets, VPN connection, hardware malfunctions, system performance, "
+    "security concerns and software installation. "
+    "For unrelated topics (general conversation, personal matters, non-IT business questions, weather, etc.), "
+    "politely say you only assist with IT issues and direct the user to the appropriate department or resource. "
+    "Give clear, helpful, professional answers. Limit your response to 500 tokens."
+)
+
+# Most recent conversation messages sent to the model on each turn
+MAX_HISTORY_MESSAGES = 20
+
+# Prompt for get_metadata, filled per message with str.format
+METADATA_PROMPT_TEMPLATE = """Analyze the message below. Reply with JSON only: no markdown, code fences or other text.
+
+Fields:
+{{"summary": "brief summary", "keywords": ["k1", "k2", "k3", "k4", "k5"], "topics": ["t1", "t2", "t3"], "content_type": "", "topic_category": "IT/HR/Finance/Security/Network/Hardware/Software/General", "difficulty_level": "beginner/intermediate/advanced", "key_concepts": ["c1", "c2", "c3"], "action_items": ["a1", "a2"] or null, "technical_terms": ["t1", "t2", "t3"] or null}}
+
+Use null for optional fields if the message is too short or irrelevant.
+
+Message: {message}"""
+
+
+# (embedding model, question) -> query vector, least recently used first
+QUERY_EMBEDDING_CACHE = OrderedDict()
+MAX_QUERY_EMBEDDINGS = 256
+# get_response runs on threadpool workers, so LRU updates are serialized
+QUERY_EMBEDDING_LOCK = threading.Lock()
+
+# Metadata fields the model returns as lists, collapsed to their first item
+LIST_METADATA_FIELDS = ("keywords", "topics", "key_concepts", "action_items", "technical_terms")
+
+
+# Keyed on the credentials instead of reading them once at import:
+# main.py calls load_dotenv() after this module has been imported
+@lru_cache(maxsize=4)
+def get_chat_client(base_url: str, api_key: str) -> openai.OpenAI:
+    """Return a shared OpenAI client for the given endpoint and key"""
+    return openai.OpenAI(base_url=base_url, api_key=api_key)
+
+
 class ChatService:
     def __init__(
         self,
@@ -24,6 +113,7 @@ class ChatService:
         # Lazy / safe initialization for Pinecone
         self.index_name = "helpdesk-kb"
         self.pinecone_client = None
+        self.pinecone_index = None
         pinecone_key = os.getenv("PINECONE_API_KEY")
         if pinecone_key:
             try:
@@ -47,69 +137,46 @@ class ChatService:
         """Transform a ticket dictionary into a user-friendly message."""
         if not ticket:
             return "Ticket not found."
-        message = (
-            f"Ticket ID: {ticket.get('id', 'N/A')}\n"
-            f"Title: {ticket.get('title', 'N/A')}\n"
-            f"Description: {ticket.get('description', 'N/A')}\n"
-            f"Priority: {ticket.get('priority', 'N/A')}\n"
-            f"Status: {ticket.get('status', 'N/A')}\n"
-            f"Assignee: {ticket.get('assignee', 'Unassigned')}\n"
-            f"Created At: {ticket.get('created_at', 'N/A')}\n"
-            f"Last Updated: {ticket.get('updated_at', 'N/A')}\n"
+        return TICKET_MESSAGE_TEMPLATE.format(
+            id=ticket.get("id", "N/A"),
+            title=ticket.get("title", "N/A"),
+            description=ticket.get("description", "N/A"),
+            priority=ticket.get("priority", "N/A"),
+            status=ticket.get("status", "N/A"),
+            assignee=ticket.get("assignee", "Unassigned"),
+            created_at=ticket.get("created_at", "N/A"),
+            updated_at=ticket.get("updated_at", "N/A"),
         )
-        return message
 
     def get_system_prompt(self) -> list:  # corrected type hint
-        return [
-            {
-                "role": "system",
-                "content": """You are an IT HelpDesk chatbot assistant. 
-                You only provide support for IT-related questions including: computer issues, network problems, software troubleshooting, email problems, printer issues, password resets, VPN connection, hardware malfunctions, system performance, security concerns, and software installation. 
-                If a user asks about topics unrelated to IT support (such as general conversation, personal matters, non-IT business questions, weather, etc.), politely inform them that you only assist with IT-related issues and direct them to contact the appropriate department or resource.
-                 Always provide clear, helpful, and professional responses for IT support topics. Limit your response to 500 tokens.""",
-            }
-        ]
+        # Fresh list around the shared prompt string; callers extend it
+        return [{"role": "system", "content": SYSTEM_PROMPT}]
 
     def load_data_messages(self) -> list:
         with open(self.chat_data_path, "r") as f:
             return json.load(f)
 
     def prepare_messages(self, messages: list, context: str) -> list:
-        default_messages = self.get_system_prompt()
+        history = messages[-MAX_HISTORY_MESSAGES:]
+        # Static system prompt and earlier turns first, per-turn retrieval
+        # context last, so the leading messages stay identical between turns
+        # and can be served from the provider's prompt cache
+        messages = self.get_system_prompt() + history[:-1]
         if context and context.strip():
-            default_messages.append(
+            messages.append(
                 {
                     "role": "user",
                     "content": f"Relevant context from knowledge base: {context}",
                 }
             )
-        messages = default_messages + messages
+        messages.extend(history[-1:])
         return messages
 
     def get_metadata(self, message: str) -> dict:
-        client = openai.OpenAI(
-            base_url=os.getenv("OPENAI_BASE_URL"), api_key=os.getenv("AZOPENAI_API_KEY")
+        client = get_chat_client(
+            os.getenv("OPENAI_BASE_URL"), os.getenv("AZOPENAI_API_KEY")
         )
-        prompt = f"""
-            Analyze the following message and provide metadata in JSON format. Do not include markdown, code fences, or any text before/after the JSON:
-            
-            Message: {message}
-            
-            Please provide the following metadata for this chunk:
-            {{
-                "summary": "Brief summary of this chunk's content",
-                "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5"],
-                "topics": ["topic1", "topic2", "topic3"],
-                "content_type": "",
-                "topic_category": "IT/HR/Finance/Security/Network/Hardware/Software/General",
-                "difficulty_level": "beginner/intermediate/advanced",
-                "key_concepts": ["concept1", "concept2", "concept3"],
-                "action_items": ["action1", "action2"] or null if none,
-                "technical_terms": ["term1", "term2", "term3"] or null if none
-            }}
-            
-            Return only valid JSON. If chunk is too short or irrelevant, return null values for optional fields.
-            """
+        prompt = METADATA_PROMPT_TEMPLATE.format(message=message)
         response = client.chat.completions.create(
             model=os.getenv("OPENAI_MODEL"),
             max_tokens=int(os.getenv("OPENAI_MAX_TOKENS")),
@@ -120,32 +187,46 @@ class ChatService:
         try:
             metadata = json.loads(response.choices[0].message.content)
             if metadata:
-                if isinstance(metadata.get("keywords"), list):
-                    metadata["keywords"] = metadata["keywords"][0]
-                if isinstance(metadata.get("topics"), list):
-                    metadata["topics"] = metadata["topics"][0]
-                if isinstance(metadata.get("key_concepts"), list):
-                    metadata["key_concepts"] = metadata["key_concepts"][0]
-                if isinstance(metadata.get("action_items"), list):
-                    metadata["action_items"] = metadata["action_items"][0]
-                if isinstance(metadata.get("technical_terms"), list):
-                    metadata["technical_terms"] = metadata["technical_terms"][0]
+                for field in LIST_METADATA_FIELDS:
+                    value = metadata.get(field)
+                    if isinstance(value, list):
+                        metadata[field] = value[0]
             return metadata
         except Exception as e:
             print(e)
             return None
 
+    def get_index(self):
+        """Return the Pinecone index handle, resolved once per service"""
+        # Index() looks up the index host with a control-plane request, so
+        # the handle is kept instead of being rebuilt on every chat turn
+        if self.pinecone_index is None:
+            self.pinecone_index = self.pinecone_client.Index(self.index_name)
+        return self.pinecone_index
+
     def query_pinecone(self, message: str, metadata: dict) -> str:
         """Query Pinecone for relevant documents using embeddings to match storage format"""
         if not self.pinecone_client or not self.openai_client_emb:
             return None
         try:
-            embedding_response = self.openai_client_emb.embeddings.create(
-                input=message, model=os.getenv(
-                    "AZOPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
-            )
-            query_embedding = embedding_response.data[0].embedding
-            results = self.pinecone_client.Index(self.index_name).query(
+            model = os.getenv("AZOPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+            # Embeddings are deterministic, so repeated questions reuse the
+            # stored vector instead of another embeddings round trip
+            cache_key = (model, message)
+            with QUERY_EMBEDDING_LOCK:
+                query_embedding = QUERY_EMBEDDING_CACHE.get(cache_key)
+                if query_embedding is not None:
+                    QUERY_EMBEDDING_CACHE.move_to_end(cache_key)
+            if query_embedding is None:
+                embedding_response = self.openai_client_emb.embeddings.create(
+                    input=message, model=model
+                )
+                query_embedding = embedding_response.data[0].embedding
+                with QUERY_EMBEDDING_LOCK:
+                    QUERY_EMBEDDING_CACHE[cache_key] = query_embedding
+                    if len(QUERY_EMBEDDING_CACHE) > MAX_QUERY_EMBEDDINGS:
+                        QUERY_EMBEDDING_CACHE.popitem(last=False)
+            results = self.get_index().query(
                 vector=query_embedding, top_k=1, include_metadata=True
             )
             return results
@@ -154,7 +235,7 @@ class ChatService:
             return None
 
     def query_by_vector(self, message: str) -> str:
-        index = self.pinecone_client.Index(self.index_name)
+        index = self.get_index()
         embeddings = OpenAIEmbeddings(
             api_key=os.getenv("AZOPENAI_EMBEDDING_API_KEY"),
             base_url=os.getenv("OPENAI_BASE_URL"),
@@ -192,16 +273,9 @@ class ChatService:
         )
         answer_prompt = ChatPromptTemplate.from_messages(
             [
-                (
-                    "system",
-                    """You are an IT HelpDesk chatbot assistant. 
-                You only provide support for IT-related questions including: computer issues, network problems, software troubleshooting, email problems, printer issues, password resets, VPN connection, hardware malfunctions, system performance, security concerns, and software installation. 
-                If a user asks about topics unrelated to IT support (such as general conversation, personal matters, non-IT business questions, weather, etc.), politely inform them that you only assist with IT-related issues and direct them to contact the appropriate department or resource.
-                 Always provide clear, helpful, and professional responses for IT support topics. Limit your response to 500 tokens.""",
-                ),
+                ("system", SYSTEM_PROMPT),
                 MessagesPlaceholder("chat_history"),
-                ("user", """Question: {input}
-                            Context:\n{context}"""),
+                ("user", "Question: {input}\nContext:\n{context}"),
             ]
         )
         combine_chain = create_stuff_documents_chain(llm, answer_prompt)
@@ -212,6 +286,43 @@ class ChatService:
 
         return rag_chain.invoke({"input": message})
 
+    def _handle_get_ticket_status(self, raw_arguments: str) -> str:
+        try:
+            arguments = json.loads(raw_arguments)
+            ticket_id = arguments.get("ticket_id")
+            ticket = self.ticket_service.find_ticket_by_partial_id(
+                ticket_id) if ticket_id else None
+            return self.ticket_to_friendly_message(ticket)
+        except Exception as e:
+            print(f"[ChatService] get_ticket_status error: {e}")
+            return "Unable to retrieve the ticket information."
+
+    def _handle_create_ticket(self, raw_arguments: str) -> str:
+        try:
+            arguments = json.loads(raw_arguments)
+            if not arguments.get("title") or not arguments.get("description"):
+                return "Missing title or description to create a ticket."
+            # Only the tool-schema fields; other keys the model sends, such
+            # as assignee, are ignored
+            ticket = self.ticket_service.create_ticket(
+                TicketCreate(
+                    title=arguments["title"],
+                    description=arguments["description"],
+                    priority=arguments.get("priority", "medium"),
+                    status="open",
+                )
+            )
+            return self.ticket_to_friendly_message(ticket)
+        except Exception as e:
+            print(f"[ChatService] create_ticket error: {e}")
+            return "Unable to create a ticket at this time."
+
+    # Tool name -> handler, resolved with a single dict lookup per tool call
+    TOOL_HANDLERS = {
+        "get_ticket_status": _handle_get_ticket_status,
+        "create_ticket": _handle_create_ticket,
+    }
+
     # sk-DRKoljlUoP4FtPCOBVy71Q
     def get_response(self, messages: list, message: str) -> str:
         # Fast failure if no OpenAI API key
@@ -234,44 +345,15 @@ class ChatService:
             print(f"[ChatService] Context retrieval failed: {e}")
 
         try:
-            client = openai.OpenAI(
-                base_url=os.getenv("OPENAI_BASE_URL"), api_key=os.getenv("AZOPENAI_API_KEY")
+            client = get_chat_client(
+                os.getenv("OPENAI_BASE_URL"), os.getenv("AZOPENAI_API_KEY")
             )
             response = client.chat.completions.create(
                 model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
                 max_tokens=int(os.getenv("OPENAI_MAX_TOKENS", "512")),
                 temperature=float(os.getenv("OPENAI_TEMPERATURE", "0.1")),
                 messages=self.prepare_messages(messages, context),
-                tools=[
-                    {
-                        "type": "function",
-                        "function": {
-                            "name": "get_ticket_status",
-                            "description": "Get the status of a ticket",
-                            "parameters": {
-                                "type": "object",
-                                "properties": {"ticket_id": {"type": "string"}},
-                            },
-                            "required": ["ticket_id"],
-                        },
-                    },
-                    {
-                        "type": "function",
-                        "function": {
-                            "name": "create_ticket",
-                            "description": "Create a ticket",
-                            "parameters": {
-                                "type": "object",
-                                "properties": {
-                                    "title": {"type": "string"},
-                                    "description": {"type": "string"},
-                                    "priority": {"type": "string"},
-                                },
-                            },
-                            "required": ["title", "description"],
-                        },
-                    },
-                ],
+                tools=CHAT_TOOLS,
             )
         except Exception as e:
             print(f"[ChatService] OpenAI request failed: {e}")
@@ -285,38 +367,12 @@ class ChatService:
 
         if tool_calls:
             for tool_call in tool_calls:
-                if tool_call.function.name == "get_ticket_status":
-                    try:
-                        arguments = json.loads(tool_call.function.arguments)
-                        ticket_id = arguments.get("ticket_id")
-                        ticket = self.ticket_service.find_ticket_by_partial_id(
-                            ticket_id) if ticket_id else None
-                        return self.ticket_to_friendly_message(ticket)
-                    except Exception as e:
-                        print(f"[ChatService] get_ticket_status error: {e}")
-                        return "Unable to retrieve the ticket information."
-                elif tool_call.function.name == "create_ticket":
-                    try:
-                        arguments = json.loads(tool_call.function.arguments)
-                        title = arguments.get("title")
-                        description = arguments.get("description")
-                        priority = arguments.get("priority", "medium")
-                        if not title or not description:
-                            return "Missing title or description to create a ticket."
-                        ticket = self.ticket_service.create_ticket(
-                            TicketCreate(
-                                title=title,
-                                description=description,
-                                priority=priority,
-                                status="open",
-                            )
-                        )
-                        return self.ticket_to_friendly_message(ticket)
-                    except Exception as e:
-                        print(f"[ChatService] create_ticket error: {e}")
-                        return "Unable to create a ticket at this time."
+                handler = self.TOOL_HANDLERS.get(tool_call.function.name)
+                if handler:
+                    return handler(self, tool_call.function.arguments)
         else:
             content = getattr(response.choices[0].message, "content", None)
             if content:
                 return content
-            return "Sorry, I cannot process this request."  # final fallback
+        # Every path returns a string, so callers need no type check
+        return "Sorry, I cannot process this request."  # final fallback
@@ -1,51 +1,80 @@
+import asyncio
 import json
 import os
 import uuid
+import weakref
 from datetime import datetime
-from typing import List, Optional, Dict
+from operator import itemgetter
+from typing import List, Optional, Dict, Tuple
+
+# List-view summaries per conversation file, keyed by directory then path and
+# rebuilt only when a file's mtime changes
+_SUMMARY_CACHE: Dict[str, Dict[str, Tuple[int, Dict]]] = {}
+
+# One lock per conversation id, held from load to save by a chat turn and by
+# delete; entries drop out once no request holds a reference
+_CONVERSATION_LOCKS: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
 
 class ConversationService:
     def __init__(self, conversations_dir: str = "storage/threads"):
         self.conversations_dir = conversations_dir
         os.makedirs(conversations_dir, exist_ok=True)
 
+    def get_lock(self, conversation_id: str) -> asyncio.Lock:
+        """Lock serializing read-modify-write of one conversation"""
+        lock = _CONVERSATION_LOCKS.get(conversation_id)
+        if lock is None:
+            lock = _CONVERSATION_LOCKS[conversation_id] = asyncio.Lock()
+        return lock
+
+    def _summarize_conversation(self, conversation: Dict) -> Dict:
+        """Build the list-view summary of a conversation"""
+        # Find the first user message to use as title
+        title = f"Chat {conversation['id'][:8]}"  # Default title
+        if conversation.get("messages"):
+            for message in conversation["messages"]:
+                if message.get("role") == "user" and message.get("content"):
+                    # Use first 50 characters of the first user message as title
+                    user_content = message["content"].strip()
+                    if user_content:
+                        title = user_content[:50] + ("..." if len(user_content) > 50 else "")
+                        break
+
+        return {
+            "id": conversation["id"],
+            "title": title,
+            "lastMessage": conversation["messages"][-1]["content"][:100] if conversation["messages"] else "No messages",
+            "updatedAt": conversation["updated_at"],
+            "createdAt": conversation["created_at"]
+        }
+
     def get_all_conversations(self) -> List[Dict]:
         """Get list of all conversations with metadata"""
         conversations = []
         if os.path.exists(self.conversations_dir):
-            for filename in os.listdir(self.conversations_dir):
-                if filename.endswith(".json"):
-                    file_path = os.path.join(self.conversations_dir, filename)
-                    try:
-                        with open(file_path, 'r') as f:
+            cache = _SUMMARY_CACHE.get(self.conversations_dir, {})
+            fresh = {}
+            for entry in os.scandir(self.conversations_dir):
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime_ns
+                    cached = cache.get(entry.path)
+                    if cached is None or cached[0] != mtime:
+                        with open(entry.path, 'r') as f:
                             conversation = json.load(f)
-                            
-                            # Find the first user message to use as title
-                            title = f"Chat {conversation['id'][:8]}"  # Default title
-                            if conversation.get("messages"):
-                                for message in conversation["messages"]:
-                                    if message.get("role") == "user" and message.get("content"):
-                                        # Use first 50 characters of the first user message as title
-                                        user_content = message["content"].strip()
-                                        if user_content:
-                                            title = user_content[:50] + ("..." if len(user_content) > 50 else "")
-                                            break
-                            
-                            # Extract metadata for list view
-                            conversation_summary = {
-                                "id": conversation["id"],
-                                "title": title,
-                                "lastMessage": conversation["messages"][-1]["content"][:100] if conversation["messages"] else "No messages",
-                                "updatedAt": conversation["updated_at"],
-                                "createdAt": conversation["created_at"]
-                            }
-                            conversations.append(conversation_summary)
-                    except (json.JSONDecodeError, KeyError) as e:
-                        print(f"Error reading conversation file {filename}: {e}")
-                        continue
-        
-        # Sort by updated time, newest first
-        conversations.sort(key=lambda x: x["updatedAt"], reverse=True)
+                        cached = (mtime, self._summarize_conversation(conversation))
+                    fresh[entry.path] = cached
+                    conversations.append(dict(cached[1]))
+                except (OSError, json.JSONDecodeError, KeyError) as e:
+                    print(f"Error reading conversation file {entry.name}: {e}")
+                    continue
+            # Keep only files still present so deleted conversations drop out
+            _SUMMARY_CACHE[self.conversations_dir] = fresh
+
+        # Sort by updated time, newest first (itemgetter avoids a Python-level
+        # lambda call per conversation)
+        conversations.sort(key=itemgetter("updatedAt"), reverse=True)
         return conversations
 
     def get_conversation_messages(self, conversation_id: str) -> Optional[Dict]:
@@ -78,10 +107,11 @@ class ConversationService:
         if not conversation_id:
             conversation_id = str(uuid.uuid4())
         
+        now = datetime.now().isoformat()
         conversation = {
             "id": conversation_id,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
+            "created_at": now,
+            "updated_at": now,
             "messages": []
         }
         
@@ -92,8 +122,10 @@ class ConversationService:
         conversation["updated_at"] = datetime.now().isoformat()
         file_path = os.path.join(self.conversations_dir, f"{conversation['id']}.json")
         
+        # Serialize before truncating the file
+        data = json.dumps(conversation, indent=2)
         with open(file_path, 'w') as f:
-            json.dump(conversation, f, indent=2)
+            f.write(data)
 
     def add_message(self, conversation: Dict, role: str, content: str, 
                    timestamp: Optional[str] = None, **kwargs) -> None:
@@ -1,27 +1,11 @@
-import torch
-import scipy.io.wavfile
-import numpy as np
 import os
-from transformers import VitsModel, AutoTokenizer
+from functools import lru_cache
+from importlib.util import find_spec
 
-# Try to import audio playback libraries
-try:
-    from IPython.display import Audio, display
-    IPYTHON_AVAILABLE = True
-except ImportError:
-    IPYTHON_AVAILABLE = False
-
-try:
-    import pygame
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
-
-try:
-    from playsound import playsound
-    PLAYSOUND_AVAILABLE = True
-except ImportError:
-    PLAYSOUND_AVAILABLE = False
+# Audio playback backends, probed without importing them; each is imported
+# on first use inside its player
+PYGAME_AVAILABLE = find_spec("pygame") is not None
+PLAYSOUND_AVAILABLE = find_spec("playsound") is not None
 
 
 def load_vn_speech_model():
@@ -32,35 +16,49 @@ def load_en_speech_model():
     return load_speech_model("facebook/mms-tts-eng")
 
 
+# One loaded model per name for the life of the process; failures raise
+# and are therefore not cached, so a later call can retry
+@lru_cache(maxsize=2)
+def _load_cached_speech_model(model_name):
+    from transformers import VitsModel, AutoTokenizer
+
+    model = VitsModel.from_pretrained(model_name)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    return model, tokenizer
+
+
 def load_speech_model(model_name="facebook/mms-tts-eng"):
     try:
-        model = VitsModel.from_pretrained(model_name)
-        tokenizer = AutoTokenizer.from_pretrained(model_name)
-
-        return model, tokenizer
+        return _load_cached_speech_model(model_name)
     except Exception as e:
         return None, None
 
 
 def generate_speech(model, tokenizer, text):
     try:
+        import torch
+        import numpy as np
+
         # Tokenize the input text
         inputs = tokenizer(text, return_tensors="pt")
 
-        # Generate speech
-        with torch.no_grad():
+        # Generate speech (inference_mode skips all autograd bookkeeping)
+        with torch.inference_mode():
             output = model(**inputs).waveform
 
         # Convert PyTorch tensor to numpy array
         waveform = output.squeeze().cpu().numpy()
         sample_rate = model.config.sampling_rate
 
-        # Ensure correct data format
-        if waveform.dtype != np.float32:
-            waveform = waveform.astype(np.float32)
+        # Ensure correct data format (no copy when already float32)
+        waveform = waveform.astype(np.float32, copy=False)
 
-        # Normalize audio to prevent clipping
-        waveform = waveform / np.max(np.abs(waveform)) * 0.9
+        # Normalize audio to prevent clipping, scaling in place with a single
+        # multiply; a silent waveform is left as is instead of dividing by 0
+        peak = np.max(np.abs(waveform))
+        if peak > 0:
+            waveform *= 0.9 / peak
 
         return waveform, sample_rate
     except Exception as e:
@@ -70,7 +68,6 @@ def generate_speech(model, tokenizer, text):
 def play_audio(waveform, sample_rate, method="auto"):
     try:
         if method == "auto":
-            # Try IPython first (for Jupyter notebooks)
             if PYGAME_AVAILABLE:
                 return _play_with_pygame(waveform, sample_rate)
 
@@ -89,30 +86,32 @@ def play_audio(waveform, sample_rate, method="auto"):
 
 def _play_with_pygame(waveform, sample_rate):
     try:
-        import tempfile
+        import io
         import time
+        import pygame
+        import scipy.io.wavfile
 
         # Initialize pygame mixer
         pygame.mixer.init(frequency=sample_rate, size=-16, channels=1)
 
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-            temp_path = temp_file.name
-
-        # Save audio to temporary file
-        scipy.io.wavfile.write(temp_path, sample_rate, waveform)
+        # Build the WAV in memory; pygame loads it straight from the buffer
+        wav_buffer = io.BytesIO()
+        scipy.io.wavfile.write(wav_buffer, sample_rate, waveform)
+        wav_buffer.seek(0)
 
         # Play audio
-        pygame.mixer.music.load(temp_path)
+        pygame.mixer.music.load(wav_buffer, "wav")
         pygame.mixer.music.play()
 
-        # Wait for playback to complete
-        duration = len(waveform) / sample_rate
-        time.sleep(duration + 0.5)  # Add small buffer
+        # Wait for playback to complete, polling the mixer so we return as
+        # soon as the clip ends; the clip length plus a small buffer still
+        # bounds the wait if the mixer never reports idle
+        deadline = time.monotonic() + len(waveform) / sample_rate + 0.5
+        while pygame.mixer.music.get_busy() and time.monotonic() < deadline:
+            time.sleep(0.05)
 
         # Cleanup
         pygame.mixer.quit()
-        os.unlink(temp_path)
 
         return True
     except Exception as e:
@@ -122,7 +121,8 @@ def _play_with_pygame(waveform, sample_rate):
 def _play_with_playsound(waveform, sample_rate):
     try:
         import tempfile
-        import time
+        import scipy.io.wavfile
+        from playsound import playsound
 
         # Create temporary file
         with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
@@ -146,20 +146,10 @@ def _play_with_playsound(waveform, sample_rate):
         return False
 
 
-def text_to_speech(text):
-    # Load model
-    model, tokenizer = load_speech_model()
-    if model is None or tokenizer is None:
-        return
-
-    waveform, sample_rate = generate_speech(model, tokenizer, text)
-    if waveform is None:
-        return
-
-    play_audio(waveform, sample_rate, "pygame")
-
-
-def text_to_speech(text, model, tokenizer):
+def text_to_speech(text, model=None, tokenizer=None):
+    # Load the default model when none is supplied
+    if model is None and tokenizer is None:
+        model, tokenizer = load_speech_model()
     if model is None or tokenizer is None:
         return
 
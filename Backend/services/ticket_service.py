@@ -1,9 +1,19 @@
 import json
 import os
+import threading
 import uuid
+from bisect import bisect_left
 from datetime import datetime
-from typing import List, Optional
-from models.ticket_models import TicketCreate, TicketUpdate, Ticket
+from typing import Dict, List, Optional
+from models.ticket_models import TicketCreate, TicketUpdate
+
+# Parsed tickets and their id index per tickets file, shared by every
+# TicketService instance and reloaded only when the file's mtime changes
+_TICKETS_CACHE: Dict[str, dict] = {}
+
+# Serializes load -> mutate -> save across chat threadpool workers and the
+# ticket routes, so one writer cannot overwrite another's change
+_TICKETS_WRITE_LOCK = threading.Lock()
 
 class TicketService:
     def __init__(self, data_dir: str = "storage/tickets"):
@@ -11,30 +21,70 @@ class TicketService:
         self.tickets_file = os.path.join(data_dir, "tickets.json")
         os.makedirs(data_dir, exist_ok=True)
 
+    def _file_mtime(self) -> Optional[int]:
+        """Modification stamp of the tickets file, None if it does not exist"""
+        try:
+            return os.stat(self.tickets_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _cache_tickets(self, tickets: List[dict], mtime: Optional[int]) -> dict:
+        """Store tickets and their id indexes in the shared cache"""
+        cached = {
+            "mtime": mtime,
+            "tickets": tickets,
+            "by_id": {t["id"]: t for t in tickets},
+            # (id, position) pairs sorted by id for prefix lookups
+            "sorted_ids": sorted((t["id"], i) for i, t in enumerate(tickets)),
+        }
+        _TICKETS_CACHE[self.tickets_file] = cached
+        return cached
+
+    def _get_cached(self) -> dict:
+        """Return cached tickets, reloading them if the file has changed"""
+        mtime = self._file_mtime()
+        cached = _TICKETS_CACHE.get(self.tickets_file)
+        if cached is None or cached["mtime"] != mtime:
+            tickets = []
+            if mtime is not None:
+                with open(self.tickets_file, 'r') as f:
+                    tickets = json.load(f)
+            cached = self._cache_tickets(tickets, mtime)
+        return cached
+
+    def invalidate_cache(self) -> None:
+        """Drop cached tickets so the next access reloads the file"""
+        _TICKETS_CACHE.pop(self.tickets_file, None)
+
     def load_tickets(self) -> List[dict]:
-        """Load tickets from JSON file"""
-        if os.path.exists(self.tickets_file):
-            with open(self.tickets_file, 'r') as f:
-                return json.load(f)
-        return []
+        """Load tickets from JSON file (shared cached list, do not mutate)"""
+        return self._get_cached()["tickets"]
 
     def save_tickets(self, tickets: List[dict]) -> None:
         """Save tickets to JSON file"""
-        with open(self.tickets_file, 'w') as f:
-            json.dump(tickets, f, indent=2)
+        # Serialize first so an encoding error cannot truncate the file, then
+        # write it in one call rather than one write per encoder chunk
+        data = json.dumps(tickets, indent=2)
+        try:
+            with open(self.tickets_file, 'w') as f:
+                f.write(data)
+        except Exception:
+            self.invalidate_cache()
+            raise
+        self._cache_tickets(tickets, self._file_mtime())
 
     def get_all_tickets(self) -> List[dict]:
         """Get all tickets"""
-        return self.load_tickets()
+        # Copy so callers cannot change the shared cached list
+        return list(self.load_tickets())
 
     def get_ticket_by_id(self, ticket_id: str) -> Optional[dict]:
         """Get a specific ticket by ID"""
-        tickets = self.load_tickets()
-        return next((t for t in tickets if t["id"] == ticket_id), None)
+        return self._get_cached()["by_id"].get(ticket_id)
 
     def create_ticket(self, ticket_data: TicketCreate) -> dict:
         """Create a new ticket"""
-        tickets = self.load_tickets()
+        now = datetime.now().isoformat()
         new_ticket = {
             "id": str(uuid.uuid4()),
             "title": ticket_data.title,
@@ -42,21 +92,18 @@ class TicketService:
             "priority": ticket_data.priority if ticket_data.priority is not None else "medium",
             "status": ticket_data.status if ticket_data.status is not None else "open",
             "assignee": ticket_data.assignee if ticket_data.assignee is not None else "",
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
+            "created_at": now,
+            "updated_at": now
         }
-        tickets.append(new_ticket)
-        self.save_tickets(tickets)
+        with _TICKETS_WRITE_LOCK:
+            # Append to a copy; the cache is replaced once the file is written
+            tickets = list(self.load_tickets())
+            tickets.append(new_ticket)
+            self.save_tickets(tickets)
         return new_ticket
 
     def update_ticket(self, ticket_id: str, updates: TicketUpdate) -> Optional[dict]:
         """Update an existing ticket"""
-        tickets = self.load_tickets()
-        ticket = next((t for t in tickets if t["id"] == ticket_id), None)
-        
-        if not ticket:
-            return None
-        
         # Handle both Pydantic v1 and v2
         try:
             # Pydantic v2
@@ -64,41 +111,65 @@ class TicketService:
         except AttributeError:
             # Pydantic v1
             update_data = updates.dict(exclude_unset=True)
-            
-        for key, value in update_data.items():
-            ticket[key] = value
-        
-        ticket["updated_at"] = datetime.now().isoformat()
-        self.save_tickets(tickets)
+
+        with _TICKETS_WRITE_LOCK:
+            # Take the list and the id index from one snapshot so the ticket
+            # edited is the one in the list being saved
+            cached = self._get_cached()
+            tickets = cached["tickets"]
+            ticket = cached["by_id"].get(ticket_id)
+
+            if not ticket:
+                return None
+
+            # Nothing would change: skip the timestamp bump and the file rewrite
+            if all(key in ticket and ticket[key] == value for key, value in update_data.items()):
+                return ticket
+
+            # Apply all changed fields and the new timestamp in one update
+            ticket.update(update_data, updated_at=datetime.now().isoformat())
+            self.save_tickets(tickets)
         return ticket
 
     def delete_ticket(self, ticket_id: str) -> bool:
         """Delete a ticket"""
-        tickets = self.load_tickets()
-        ticket = next((t for t in tickets if t["id"] == ticket_id), None)
-        
-        if not ticket:
-            return False
-        
-        tickets.remove(ticket)
-        self.save_tickets(tickets)
+        with _TICKETS_WRITE_LOCK:
+            cached = self._get_cached()
+            ticket = cached["by_id"].get(ticket_id)
+
+            if not ticket:
+                return False
+
+            # Drop by identity from the same snapshot, not by equality
+            tickets = [t for t in cached["tickets"] if t is not ticket]
+            self.save_tickets(tickets)
         return True
 
     def find_ticket_by_partial_id(self, partial_id: str) -> Optional[dict]:
         """Find ticket by partial ID (used in function calling)"""
-        tickets = self.load_tickets()
-        for ticket in tickets:
-            if ticket["id"] == partial_id or ticket["id"].startswith(partial_id):
-                return ticket
-        return None
+        cached = self._get_cached()
+        ticket = cached["by_id"].get(partial_id)
+        if ticket is not None:
+            return ticket
+
+        # Ids sharing the prefix are contiguous in sorted order; return the
+        # earliest one in file order, as a linear scan would
+        sorted_ids = cached["sorted_ids"]
+        position = None
+        i = bisect_left(sorted_ids, (partial_id,))
+        while i < len(sorted_ids) and sorted_ids[i][0].startswith(partial_id):
+            if position is None or sorted_ids[i][1] < position:
+                position = sorted_ids[i][1]
+            i += 1
+        return cached["tickets"][position] if position is not None else None
 
     def get_filtered_tickets(self, status: Optional[str] = None, priority: Optional[str] = None) -> List[dict]:
         """Get tickets filtered by status and/or priority"""
         tickets = self.load_tickets()
-        
-        if status:
-            tickets = [t for t in tickets if t["status"] == status]
-        if priority:
-            tickets = [t for t in tickets if t["priority"] == priority]
-        
-        return tickets 
\ No newline at end of file
+
+        # Apply both filters in a single pass over the tickets
+        return [
+            t for t in tickets
+            if (not status or t["status"] == status)
+            and (not priority or t["priority"] == priority)
+        ] 
\ No newline at end of file
@@ -1,21 +1,44 @@
 import io
+import os
+import re
+import hashlib
 import logging
 import asyncio
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
-
-# Try to import TTS dependencies, handle gracefully if not available
-try:
-    import torch
-    import torchaudio
-    import soundfile as sf
-    from transformers import SpeechT5Processor, SpeechT5ForTextToSpeech, SpeechT5HifiGan
-    from datasets import load_dataset
-    import numpy as np
-    TTS_DEPENDENCIES_AVAILABLE = True
-except ImportError as e:
-    TTS_DEPENDENCIES_AVAILABLE = False
-    MISSING_DEPENDENCY_ERROR = str(e)
+from importlib.util import find_spec
+
+# Check TTS dependencies without importing them; torch and transformers are
+# only loaded when the models are first needed
+TTS_DEPENDENCIES = ("torch", "torchaudio", "soundfile", "transformers", "datasets", "numpy")
+_missing_dependencies = [name for name in TTS_DEPENDENCIES if find_spec(name) is None]
+TTS_DEPENDENCIES_AVAILABLE = not _missing_dependencies
+MISSING_DEPENDENCY_ERROR = f"No module named {', '.join(_missing_dependencies)}"
+
+# Short utterance synthesized once after loading to warm up the models
+WARMUP_TEXT = "Hello, how can I help you today?"
+
+# Local copy of the CMU ARCTIC x-vector (validation row 7306) used as the voice
+SPEAKER_EMBEDDING_PATH = "storage/data/speaker_embedding.pt"
+
+# SpeechT5 Linear layers kept in float32 when quantizing on CPU
+UNQUANTIZED_LAYERS = frozenset([
+    "speech_decoder_postnet.feat_out",
+    "speech_decoder_postnet.prob_out",
+])
+
+# Synthesized sentence waveforms kept in memory, keyed by a hash of the
+# text; helpdesk replies repeat often and a hit skips the model
+MAX_CACHED_AUDIO = 256
+
+# Sentence ends after which a reply is split for synthesis
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+# SpeechT5/HiFi-GAN output rate; other rates are resampled once per reply
+MODEL_SAMPLE_RATE = 16000
+
+# Silence inserted between synthesized sentences
+SENTENCE_GAP_SECONDS = 0.15
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,16 +52,25 @@ class TTSService:
             logger.warning(f"TTS dependencies not available: {MISSING_DEPENDENCY_ERROR}")
             self._dependencies_available = False
             self._initialized = False
+            self._init_future = None
             return
             
         self.processor = None
         self.model = None
         self.vocoder = None
         self.speaker_embeddings = None
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        # Resolved in _load_models, once torch has been imported
+        self.device = None
+        self.quantized = False
         self.executor = ThreadPoolExecutor(max_workers=2)
+        self._audio_cache = OrderedDict()
+        # In-flight syntheses by cache key, shared by identical concurrent requests
+        self._pending = {}
         self._dependencies_available = True
         self._initialized = False
+        # Shared executor future for the model load, set by the first caller
+        self._init_future = None
+        self._preload_task = None
         
     async def initialize(self):
         """Initialize the TTS models asynchronously"""
@@ -47,36 +79,118 @@ class TTSService:
             
         if self._initialized:
             return
-            
-        try:
+
+        # Concurrent first requests share one model load instead of each
+        # queueing their own on the executor
+        if self._init_future is None:
             logger.info("Initializing TTS service...")
-            
             # Run model loading in thread pool to avoid blocking
-            await asyncio.get_event_loop().run_in_executor(
+            self._init_future = asyncio.get_event_loop().run_in_executor(
                 self.executor, self._load_models
             )
+        init_future = self._init_future
             
-            self._initialized = True
-            logger.info("TTS service initialized successfully")
-            
+        try:
+            await asyncio.shield(init_future)
         except Exception as e:
-            logger.error(f"Failed to initialize TTS service: {e}")
+            # Clear the failed load once so a later request can retry
+            if self._init_future is init_future:
+                self._init_future = None
+                logger.error(f"Failed to initialize TTS service: {e}")
             raise
+
+        if not self._initialized:
+            self._initialized = True
+            logger.info("TTS service initialized successfully")
+
+    def start_initialization(self):
+        """Start loading the models in the background without waiting"""
+        if not self._dependencies_available or self._initialized or self._init_future is not None:
+            return
+        self._preload_task = asyncio.ensure_future(self.initialize())
+        # Failures are logged by initialize; retrieve them so asyncio does not warn
+        self._preload_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the models are loaded, without triggering a load"""
+        return self._initialized
+
+    @property
+    def is_loading(self) -> bool:
+        """Whether a model load is currently in progress"""
+        return self._init_future is not None and not self._initialized
     
     def _load_models(self):
         """Load TTS models (runs in thread pool)"""
+        try:
+            import torch
+            from transformers import SpeechT5Processor, SpeechT5ForTextToSpeech, SpeechT5HifiGan
+            from datasets import load_dataset
+        except ImportError as e:
+            raise RuntimeError(f"TTS dependencies not available: {e}") from e
+
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
         # Load processor and model
         self.processor = SpeechT5Processor.from_pretrained("microsoft/speecht5_tts")
         self.model = SpeechT5ForTextToSpeech.from_pretrained("microsoft/speecht5_tts")
         self.vocoder = SpeechT5HifiGan.from_pretrained("microsoft/speecht5_hifigan")
+
+        # Move to device; bf16 halves weight and activation traffic on GPUs
+        # that support it, CPU stays in float32
+        use_bf16 = self.device.type == "cuda" and torch.cuda.is_bf16_supported()
+        dtype = torch.bfloat16 if use_bf16 else torch.float32
+        self.model = self.model.to(self.device, dtype=dtype)
+        self.vocoder = self.vocoder.to(self.device, dtype=dtype)
+
+        # On CPU, dynamic INT8 quantization of the acoustic model's Linear
+        # layers speeds up the decoder loop; the postnet output heads stay in
+        # float32 to keep audio quality, and the conv-heavy vocoder is left as is
+        if self.device.type == "cpu":
+            quantized_layers = {
+                name for name, module in self.model.named_modules()
+                if isinstance(module, torch.nn.Linear) and name not in UNQUANTIZED_LAYERS
+            }
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, quantized_layers, dtype=torch.qint8
+            )
+            self.quantized = True
+            logger.info(f"Quantized {len(quantized_layers)} SpeechT5 Linear layers to INT8")
         
-        # Move to device
-        self.model = self.model.to(self.device)
-        self.vocoder = self.vocoder.to(self.device)
-        
-        # Load speaker embeddings
-        embeddings_dataset = load_dataset("Matthijs/cmu-arctic-xvectors", split="validation")
-        self.speaker_embeddings = torch.tensor(embeddings_dataset[7306]["xvector"]).unsqueeze(0).to(self.device)
+        # Load speaker embeddings from the local copy; only the first start
+        # downloads the x-vector dataset, then saves the one vector we use
+        if os.path.exists(SPEAKER_EMBEDDING_PATH):
+            speaker_embeddings = torch.load(SPEAKER_EMBEDDING_PATH, map_location="cpu", weights_only=True)
+        else:
+            embeddings_dataset = load_dataset("Matthijs/cmu-arctic-xvectors", split="validation")
+            speaker_embeddings = torch.tensor(embeddings_dataset[7306]["xvector"]).unsqueeze(0)
+            try:
+                os.makedirs(os.path.dirname(SPEAKER_EMBEDDING_PATH), exist_ok=True)
+                torch.save(speaker_embeddings, SPEAKER_EMBEDDING_PATH)
+            except OSError as e:
+                logger.warning(f"Could not cache speaker embedding: {e}")
+        self.speaker_embeddings = speaker_embeddings.to(self.device, dtype=dtype)
+
+        # Compile the feed-forward HiFi-GAN vocoder for fused conv kernels.
+        # Spectrogram length varies per utterance, so compile for dynamic
+        # shapes instead of recompiling (or recording a graph) per length
+        eager_vocoder = self.vocoder
+        if hasattr(torch, "compile"):
+            try:
+                self.vocoder = torch.compile(self.vocoder, dynamic=True)
+            except Exception as e:
+                logger.warning(f"Vocoder compilation unavailable: {e}")
+
+        # Run one short utterance so compilation, kernel selection and
+        # allocator warm-up happen here rather than on the first user request
+        try:
+            self._generate_speech(WARMUP_TEXT)
+        except Exception as e:
+            logger.warning(f"TTS warm-up failed: {e}")
+            # Compilation errors only surface on the first call; fall back
+            # to the eager vocoder rather than failing every request
+            self.vocoder = eager_vocoder
     
     async def text_to_speech(self, text: str, sample_rate: int = 16000) -> bytes:
         """
@@ -94,48 +208,106 @@ class TTSService:
             
         if not self._initialized:
             await self.initialize()
+
+        # Synthesize sentence by sentence: each sentence is cached on its own,
+        # so replies sharing boilerplate sentences reuse them, and SpeechT5
+        # never sees one input longer than its text position limit. The
+        # response still waits for every sentence
+        sentences = [part for part in SENTENCE_BOUNDARY.split(text) if part.strip()] or [text]
+        segments = await asyncio.gather(
+            *(self._synthesize_sentence(sentence) for sentence in sentences)
+        )
+        # Joining, resampling and PCM encoding scale with reply length; keep
+        # them off the event loop, as synthesis is
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor, self._encode_wav, segments, sample_rate
+        )
+
+    async def _synthesize_sentence(self, text: str):
+        """Return the model-rate waveform for one sentence, from cache when possible"""
+        cache_key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        audio_data = self._audio_cache.get(cache_key)
+        if audio_data is not None:
+            self._audio_cache.move_to_end(cache_key)
+            return audio_data
+        
+        # Identical text already being synthesized: wait for that result
+        # instead of queueing a second model run
+        pending = self._pending.get(cache_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
         
         try:
             # Run TTS generation in thread pool
-            audio_data = await asyncio.get_event_loop().run_in_executor(
-                self.executor, self._generate_speech, text, sample_rate
+            future = asyncio.get_event_loop().run_in_executor(
+                self.executor, self._generate_speech, text
             )
+            self._pending[cache_key] = future
+            # Shielded so a disconnecting client does not cancel the run
+            # for the other requests waiting on it
+            audio_data = await asyncio.shield(future)
+            self._audio_cache[cache_key] = audio_data
+            if len(self._audio_cache) > MAX_CACHED_AUDIO:
+                self._audio_cache.popitem(last=False)
             return audio_data
             
         except Exception as e:
             logger.error(f"TTS generation failed: {e}")
             raise
+        finally:
+            self._pending.pop(cache_key, None)
+
+    def _encode_wav(self, segments: list, sample_rate: int) -> bytes:
+        """Join sentence waveforms into one WAV file (runs in thread pool)"""
+        import numpy as np
+        import soundfile as sf
+
+        if len(segments) == 1:
+            speech_np = segments[0]
+        else:
+            # A short pause between sentences so they do not run together
+            gap = np.zeros(int(MODEL_SAMPLE_RATE * SENTENCE_GAP_SECONDS), dtype=np.float32)
+            parts = [segments[0]]
+            for segment in segments[1:]:
+                parts.extend((gap, segment))
+            speech_np = np.concatenate(parts)
+
+        # Resample the joined reply once, so there are no per-sentence
+        # filter edges at the joins
+        if sample_rate != MODEL_SAMPLE_RATE:
+            import torch
+            import torchaudio
+
+            speech_tensor = torch.from_numpy(speech_np).unsqueeze(0)
+            resampler = torchaudio.transforms.Resample(MODEL_SAMPLE_RATE, sample_rate)
+            speech_np = resampler(speech_tensor).squeeze(0).numpy()
+
+        # 16-bit PCM keeps the WAV half the size of float32 samples;
+        # getvalue() reads the whole buffer, no seek needed
+        audio_buffer = io.BytesIO()
+        sf.write(audio_buffer, speech_np, sample_rate, format='WAV', subtype='PCM_16')
+        
+        return audio_buffer.getvalue()
     
-    def _generate_speech(self, text: str, sample_rate: int) -> bytes:
-        """Generate speech from text (runs in thread pool)"""
+    def _generate_speech(self, text: str):
+        """Generate a float32 model-rate waveform from text (runs in thread pool)"""
+        import torch
+
         # Preprocess text
-        inputs = self.processor(text=text, return_tensors="pt").to(self.device)
+        input_ids = self.processor(text=text, return_tensors="pt")["input_ids"].to(self.device)
         
-        # Generate speech
-        with torch.no_grad():
+        # Generate speech; inference_mode also skips autograd's version
+        # counter and view tracking that no_grad still maintains
+        with torch.inference_mode():
             speech = self.model.generate_speech(
-                inputs["input_ids"], 
+                input_ids, 
                 self.speaker_embeddings, 
                 vocoder=self.vocoder
             )
         
-        # Convert to numpy and ensure correct format
-        speech_np = speech.cpu().numpy()
-        
-        # Resample if needed
-        if sample_rate != 16000:
-            # Use torchaudio for resampling
-            speech_tensor = torch.from_numpy(speech_np).unsqueeze(0)
-            resampler = torchaudio.transforms.Resample(16000, sample_rate)
-            speech_tensor = resampler(speech_tensor)
-            speech_np = speech_tensor.squeeze().numpy()
-        
-        # Convert to bytes using soundfile
-        audio_buffer = io.BytesIO()
-        sf.write(audio_buffer, speech_np, sample_rate, format='WAV')
-        audio_buffer.seek(0)
-        
-        return audio_buffer.getvalue()
+        # Convert to numpy and ensure correct format (float32 even when the
+        # model runs in bf16, which numpy cannot represent)
+        return speech.float().cpu().numpy()
     
     def cleanup(self):
         """Cleanup resources"""
@@ -146,10 +318,8 @@ class TTSService:
 tts_service = TTSService()
 
 async def get_tts_service() -> TTSService:
-    """Get initialized TTS service instance"""
-    if not tts_service._dependencies_available:
-        # Return service even if dependencies aren't available - the error will be handled in the endpoint
-        return tts_service
-    if not tts_service._initialized:
-        await tts_service.initialize()
+    """Get the TTS service instance; models load on first synthesis"""
+    # Not initialized here so /tts/health answers immediately; text_to_speech
+    # awaits the shared model load itself, and missing dependencies are
+    # reported by the endpoints
     return tts_service
@@ -1,17 +1,33 @@
-import chromadb
 from openai import OpenAI
 import os
 import json
 import hashlib
-import re
 from datetime import datetime
 from pinecone import ServerlessSpec, Pinecone
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_openai import OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
-from langchain.chains.combine_documents import create_stuff_documents_chain
+
+
+# Output dimension per known embedding model
+EMBEDDING_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+# Default to text-embedding-3-small dimension
+DEFAULT_EMBEDDING_DIMENSION = 1536
+
+# Prompt for _analyze_chunk, filled per chunk with str.format
+CHUNK_METADATA_PROMPT_TEMPLATE = """Analyze the document chunk below. Reply with JSON only: no markdown, code fences or other text.
+
+Fields:
+{{"chunk_summary": "brief summary", "keywords": ["k1", "k2", "k3", "k4", "k5"], "topics": ["t1", "t2", "t3"], "content_type": "documentation/faq/guide/policy/troubleshooting/code/other", "topic_category": "IT/HR/Finance/Security/Network/Hardware/Software/General", "difficulty_level": "beginner/intermediate/advanced", "key_concepts": ["c1", "c2", "c3"], "action_items": ["a1", "a2"] or null, "technical_terms": ["t1", "t2", "t3"] or null}}
+
+Use null for optional fields if the chunk is too short or irrelevant.
+
+Chunk {chunk_num} of {total_chunks}: {chunk}"""
 
 
 class UploadFileService:
@@ -35,15 +51,14 @@ class UploadFileService:
         )
 
         # Set dimension based on the embedding model
-        if "text-embedding-3-small" in self.embedding_model:
-            self.embedding_dimension = 1536
-        elif "text-embedding-3-large" in self.embedding_model:
-            self.embedding_dimension = 3072
-        elif "text-embedding-ada-002" in self.embedding_model:
-            self.embedding_dimension = 1536
-        else:
-            # Default to text-embedding-3-small dimension
-            self.embedding_dimension = 1536
+        self.embedding_dimension = next(
+            (
+                dimension
+                for model, dimension in EMBEDDING_DIMENSIONS.items()
+                if model in self.embedding_model
+            ),
+            DEFAULT_EMBEDDING_DIMENSION,
+        )
         #self.pinecone_client.delete_index(self.index_name)
         if not self.pinecone_client.has_index(self.index_name):
             self.pinecone_client.create_index(
@@ -53,6 +68,19 @@ class UploadFileService:
                 spec=ServerlessSpec(region="us-east-1", cloud="aws"),
             )
 
+        # Built once per service: resolving the Index handle is a Pinecone
+        # round trip, and the embeddings client keeps its HTTP connection
+        # pool, so uploads (including concurrent bulk ones) reuse both
+        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
+        self.vector_store = PineconeVectorStore(
+            index=self.pinecone_client.Index(self.index_name),
+            embedding=OpenAIEmbeddings(
+                api_key=os.getenv("AZOPENAI_EMBEDDING_API_KEY"),
+                base_url=os.getenv("OPENAI_BASE_URL"),
+                model=self.embedding_model,
+            ),
+        )
+
     def embed_text(self, text: str):
         # Use OpenAI's embedding endpoint
         response = self.openai_client_emb.embeddings.create(
@@ -132,26 +160,9 @@ class UploadFileService:
         Analyze a single chunk and return metadata
         """
         try:
-            prompt = f"""
-            Analyze chunk {chunk_num} of {total_chunks} from a document and provide metadata in JSON format. Do not include markdown, code fences, or any text before/after the JSON:
-            
-            Chunk content: {chunk}
-            
-            Please provide the following metadata for this chunk:
-            {{
-                "chunk_summary": "Brief summary of this chunk's content",
-                "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5"],
-                "topics": ["topic1", "topic2", "topic3"],
-                "content_type": "documentation/faq/guide/policy/troubleshooting/code/other",
-                "topic_category": "IT/HR/Finance/Security/Network/Hardware/Software/General",
-                "difficulty_level": "beginner/intermediate/advanced",
-                "key_concepts": ["concept1", "concept2", "concept3"],
-                "action_items": ["action1", "action2"] or null if none,
-                "technical_terms": ["term1", "term2", "term3"] or null if none
-            }}
-            
-            Return only valid JSON. If chunk is too short or irrelevant, return null values for optional fields.
-            """
+            prompt = CHUNK_METADATA_PROMPT_TEMPLATE.format(
+                chunk_num=chunk_num, total_chunks=total_chunks, chunk=chunk
+            )
 
             response = self.openai_client_chat.chat.completions.create(
                 model=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
@@ -167,10 +178,6 @@ class UploadFileService:
             print(f"Error analyzing chunk {chunk_num}: {str(e)}")
             return None
 
-        pattern = r"^```json\s*(.*?)\s*```$"
-        cleaned_string = re.sub(pattern, r"\1", json_string, flags=re.DOTALL)
-        return cleaned_string.strip()
-
     def store_file_content(
         self,
         file_content: str,
@@ -185,18 +192,8 @@ class UploadFileService:
                     metadata={"file_name": file_name},
                 )
             ]
-            splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
-            docs = splitter.split_documents(raw_docs)
-            index = self.pinecone_client.Index(self.index_name)
-            embeddings = OpenAIEmbeddings(
-                api_key=os.getenv("AZOPENAI_EMBEDDING_API_KEY"),
-                base_url=os.getenv("OPENAI_BASE_URL"),
-                model=self.embedding_model)
-            vector_store = PineconeVectorStore(
-                index=index, 
-                embedding=embeddings
-            )
-            vector_store.add_documents(docs)
+            docs = self.text_splitter.split_documents(raw_docs)
+            self.vector_store.add_documents(docs)
             return {
                 "status": "success",
                 "file_name": file_name,
@@ -36,13 +36,9 @@ fi
 echo "🔋 Activating virtual environment..."
 source venv/bin/activate
 
-# Upgrade pip to latest version
-echo "⬆️  Upgrading pip..."
-pip install --upgrade pip
-
-# Install wheel and setuptools first
-echo "🛠️  Installing build tools..."
-pip install wheel setuptools
+# Upgrade pip and install build tools in a single pip run
+echo "⬆️  Upgrading pip and installing build tools..."
+pip install --upgrade pip wheel setuptools
 
 # For macOS with Apple Silicon, we might need to set some environment variables
 if [[ "$OSTYPE" == "darwin"* ]] && [[ $(uname -m) == "arm64" ]]; then